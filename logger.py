@@ -8,10 +8,16 @@ This module is intended to provide wrappers to functions such as print, plt.show
 """
 from pathlib import Path
 from datetime import datetime
+import atexit
+import functools
+import inspect
+import multiprocessing
 import os
-import matplotlib.pyplot as plt
-# Conversion of functions source to string
-import dill.source
+import pickle
+import queue
+import sys
+import threading
+import time
 
 
 #------------- Initialization -------------#
@@ -23,11 +29,90 @@ PLOT_PATH = MAIN_PATH / 'temp'
 
 # Ensure the folders exist for any running
 PLOT_PATH.mkdir(exist_ok=True, parents=True)
+# Plot folder as a ready-to-concatenate string, so building a plot filename
+    # is pure string work rather than Path construction per figure
+_PLOT_PREFIX = os.fspath(PLOT_PATH) + os.sep
 # Path for log file
 LOG_PATH = MAIN_PATH / 'log.txt'
-# Serializes this portion of the log, also serves as a flag for indicating
-    # whether something new has been logged
+# Whether the log already has content, cached once here so headers don't pay
+    # a stat() per serial just to decide on padding
+_LOG_NONEMPTY = LOG_PATH.exists() and LOG_PATH.stat().st_size > 0
+# Persistent raw descriptor for the log, skipping Python's buffered text
+    # layers entirely: each record becomes a single write(2). Appends are
+    # atomic on POSIX (O_APPEND), so reusing one descriptor is still safe
+    # across processes while avoiding an open/close syscall pair per message
+_LOG_FD = os.open(str(LOG_PATH), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+# Queue of pre-formatted strings drained to the log by a background thread,
+    # so callers only pay for an in-memory enqueue rather than blocking on
+    # disk I/O. A None sentinel tells the drain thread to stop
+_LOG_Q = queue.SimpleQueue()
+
+
+def _drain():
+    """ Drains queued log records to the log file. Runs on a daemon thread
+        until the shutdown sentinel is received. Records which have piled up behind the first are gathered into a single writev(2) call, amortizing the syscall cost during bursts.
+
+        Returns:
+            (None): none
+
+    """
+    warned = False
+    stop = False
+    while not stop:
+        record = _LOG_Q.get()
+        if record is None:
+            break
+
+        bufs = [record.encode('utf-8')]
+        # Gather any backlog into the same write, bounded to keep latency
+            # in check
+        while len(bufs) < 64 and not _LOG_Q.empty():
+            record = _LOG_Q.get_nowait()
+            if record is None:
+                stop = True
+                break
+            bufs.append(record.encode('utf-8'))
+
+        # A failed write (disk full, revoked descriptor, ...) drops this
+            # batch but must not kill the thread: with no reader, every
+            # later log call would pile records into the queue forever
+        try:
+            os.writev(_LOG_FD, bufs)
+        except OSError as e:
+            if not warned:
+                warned = True
+                print(f'logger: failed to write to log: {e}',
+                    file=sys.stderr)
+
+
+_DRAIN_THREAD = threading.Thread(target=_drain, daemon=True)
+_DRAIN_THREAD.start()
+
+
+def _shutdown():
+    """ Flushes any pending log records and closes the log on interpreter
+        exit.
+
+        Returns:
+            (None): none
+
+    """
+    _LOG_Q.put(None)
+    _DRAIN_THREAD.join()
+    os.close(_LOG_FD)
+
+
+atexit.register(_shutdown)
+# A banner to surround the serial in log headers
+_BANNER = '=' * 80
+# Serializes this portion of the log. Minted lazily by the first log call
+    # (see the bootstrap swap in the Logging section), so importing the
+    # module has no log side effects
 SERIAL = None
+# Last microsecond timestamp handed out as a serial, bumped on collision so
+    # serials minted in the same microsecond stay unique and sortable
+_LAST_US = 0
 #------------- End init -------------#
 
 
@@ -40,15 +125,30 @@ def get_serial(): return SERIAL
 
 # Constructor
 def _serialize():
-    """ Generates a unique serial code, useful for file saving to prevent 
-        overwriting and conflicts. First portion of the serial code is the date and time requested (ymdHMS), with up to millisecond implementation. This makes the serial code sortable. Useful in creating identifiers for files.
-    
+    """ Generates a unique serial code, useful for file saving to prevent
+        overwriting and conflicts. First portion of the serial code is the date and time requested (ymdHMS), with up to microsecond implementation. This makes the serial code sortable. Serials minted within the same microsecond are bumped to the next free microsecond, so two calls never collide. Useful in creating identifiers for files.
+
         Returns:
             (int): the serial.
-    
+
     """
-    # Up to millisecond precision included
-    return datetime.now().strftime('%y%m%d%H%M%S%f')[:-3]
+    global _LAST_US
+    # Up to microsecond precision included
+    # Formatted from integer time fields directly since strftime with %f is
+        # considerably slower
+    us = time.time_ns() // 1_000
+    # Guarantee uniqueness and monotonicity within this process
+    if us <= _LAST_US:
+        us = _LAST_US + 1
+    _LAST_US = us
+
+    tm = time.localtime(us // 1_000_000)
+    # Kept as an int: comparisons and sorting stay cheap, and consumers only
+        # format it to a string at I/O boundaries
+    return int(
+        f'{tm.tm_year % 100:02d}{tm.tm_mon:02d}{tm.tm_mday:02d}'
+        f'{tm.tm_hour:02d}{tm.tm_min:02d}{tm.tm_sec:02d}{us % 1_000_000:06d}'
+    )
 
 
 # Setter
@@ -64,8 +164,8 @@ def gen_serial():
     SERIAL = _serialize()
 
     # Every time the serial is updated, it's considered a new entry for the log
-    with open(LOG_PATH, 'a') as f:
-        _write_header(f)
+    # The header is formatted here so the drain thread never reads SERIAL
+    _LOG_Q.put(_format_header())
 
     return SERIAL
 
@@ -73,45 +173,44 @@ def gen_serial():
 ######################## Miscellaneous ########################
 
 
+@functools.lru_cache(maxsize=256)
 def _get_func_source(func):
-    """ Gets the source code of the function.
-        
+    """ Gets the source code of the function. Cached, since fetching source
+        reparses the file on disk and the same function is often logged more than once.
+
         Args:
             func (function): the function of interest.
-    
+
         Returns:
             (str): the source code.
-    
+
     """
-    return dill.source.getsource(func).strip()
+    try:
+        return inspect.getsource(func).strip()
+    except (TypeError, OSError):
+        # dill recovers source for objects inspect can't (e.g. functions
+            # defined interactively); imported lazily since it's heavy
+        import dill.source
+        return dill.source.getsource(func).strip()
 
 
-def _write_header(f):
-    """ Prints a header to separate log entries.
-        
-        Args:
-            f (file): the file object (the log) to write to.
-    
+def _format_header():
+    """ Formats a header to separate log entries.
+
         Returns:
-            (None): none
-    
-    """
-    # A banner to surround the serial
-    banner = 80 * '='
+            (str): the header.
 
+    """
+    global _LOG_NONEMPTY
     # Padding between entries
     # Make sure the file isn't empty for this
-    if os.path.getsize(LOG_PATH):
-        f.write('\n\n')
-
-    ### Header writing ###
+    padding = '\n\n' if _LOG_NONEMPTY else ''
+    # Anything written from here on means the log has content
+    _LOG_NONEMPTY = True
 
-    # Write the serial in the header for this log
-    f.write(banner + '\n')
-    f.write(SERIAL + '\n')
-    # Print the date and time
-    f.write(datetime.now().strftime("%m/%d/%Y %H:%M:%S") + '\n')
-    f.write(banner + '\n')
+    # Assemble the entire header: the serial plus the date and time
+    timestamp = datetime.now().strftime("%m/%d/%Y %H:%M:%S")
+    return f'{padding}{_BANNER}\n{SERIAL}\n{timestamp}\n{_BANNER}\n'
     
 
 ######################## Logging ########################
@@ -132,29 +231,49 @@ def log(message=''):
     print(message)
 
 
-def logsilent(message=''):
+def _logsilent(message=''):
     """ Same as log, but does not print to stdout.
-        
+
         Args:
             message (str): the message to be saved.
-    
+
         Returns:
             (None): none
-    
-    """
-    # This is the first log being done.
-    if SERIAL == None: gen_serial()
 
+    """
     # Check if this is a function trying to be logged
     if callable(message):
         # Convert the function's source code to a string
         message = _get_func_source(message)
 
-    with open(LOG_PATH, 'a') as f:
-        # Write the serial for this log
-        f.write(str(message))
-        # Padding between metadata entries
-        f.write('\n')
+    # Enqueue the message and its padding between metadata entries; the
+        # drain thread handles the actual disk write
+    _LOG_Q.put(f'{message}\n')
+
+
+def _bootstrap_logsilent(message=''):
+    """ First-call implementation of logsilent: mints the initial serial,
+        then swaps the fast path into the module so later calls skip the bootstrap check entirely.
+
+        Args:
+            message (str): the message to be saved.
+
+        Returns:
+            (None): none
+
+    """
+    global logsilent
+    # Guarded so callers holding a direct reference to this function stay
+        # correct even after the swap
+    if SERIAL is None: gen_serial()
+
+    logsilent = _logsilent
+    _logsilent(message)
+
+
+# One-shot swap: starts on the bootstrap path, replaced by the fast path
+    # after the first call
+logsilent = _bootstrap_logsilent
 
 
 def logfunc(func):
@@ -173,30 +292,209 @@ def logfunc(func):
 ######################## Plots ########################
 
 
-def logfig():
-    """ Logs the figure without showing it.
-        
+# matplotlib.pyplot, imported on first use: pulling it in at module load
+    # costs hundreds of ms and tens of MB even for text-only logging
+plt = None
+
+
+def _import_plt():
+    """ Imports matplotlib.pyplot on first use and caches the module.
+
+        Returns:
+            (module): the matplotlib.pyplot module.
+
+    """
+    global plt
+    if plt is None:
+        import matplotlib.pyplot
+        plt = matplotlib.pyplot
+    return plt
+
+
+# Worker process which renders and saves queued figures off the main process,
+    # started lazily on the first logfig call
+_PLOT_Q = None
+_PLOT_PROC = None
+
+
+def _save_fig_job(job):
+    """ Saves a single queued figure to disk. A figure that fails to
+        unpickle or save is reported and skipped rather than raised, so one bad figure can't take down the worker and strand every later one.
+
+        Args:
+            job (tuple): the (figure bytes, filename, savefig kwargs) job.
+
         Returns:
             (None): none
-    
+
+    """
+    fig_bytes, fname, kwargs = job
+    try:
+        fig = pickle.loads(fig_bytes)
+        try:
+            # A large explicit buffer coalesces the backend's many small
+                # writes into a few big ones
+            with open(fname, 'wb', buffering=1 << 20) as fp:
+                fig.savefig(fp, **kwargs)
+        finally:
+            # Unpickling a pyplot figure re-registers it with Gcf, so it
+                # must be closed — even on a failed save — or the process
+                # leaks one figure, canvas, and manager per job
+            _import_plt().close(fig)
+    except Exception as e:
+        print(f'logger: failed to save figure {fname}: {e}', file=sys.stderr)
+
+
+def _plot_worker(q):
+    """ Saves queued figures to disk. Runs on a worker process until the
+        shutdown sentinel is received.
+
+        Args:
+            q (multiprocessing.Queue): queue of (figure bytes, filename, savefig kwargs) jobs.
+
+        Returns:
+            (None): none
+
+    """
+    # Force the headless Agg backend before any figure is restored, so a
+        # fork child of a GUI-backend parent doesn't instantiate a GUI
+        # figure manager per job
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+    while True:
+        job = q.get()
+        if job is None:
+            break
+        _save_fig_job(job)
+
+
+def _ensure_plot_worker():
+    """ Starts the figure-saving worker process if it isn't running yet.
+
+        Returns:
+            (None): none
+
+    """
+    global _PLOT_Q, _PLOT_PROC
+    if _PLOT_PROC is None:
+        _PLOT_Q = multiprocessing.Queue()
+        _PLOT_PROC = multiprocessing.Process(
+            target=_plot_worker, args=(_PLOT_Q,), daemon=True
+        )
+        _PLOT_PROC.start()
+        atexit.register(_shutdown_plot_worker)
+
+
+def _shutdown_plot_worker():
+    """ Waits for any pending figure saves to finish on interpreter exit.
+        If the worker died, the pending figures are saved here instead so they aren't silently lost (and so the queue's feeder thread can't block exit waiting on a reader that's gone).
+
+        Returns:
+            (None): none
+
+    """
+    if _PLOT_PROC.is_alive():
+        _PLOT_Q.put(None)
+        _PLOT_PROC.join()
+        return
+
+    print('logger: figure worker died; saving pending figures synchronously',
+        file=sys.stderr)
+    while True:
+        try:
+            job = _PLOT_Q.get_nowait()
+        except queue.Empty:
+            break
+        if job is not None:
+            _save_fig_job(job)
+
+
+def _savefig_args(fmt, tight):
+    """ Builds the filename and keyword arguments for saving the current
+        figure under the active serial.
+
+        Args:
+            fmt (str): the file format to save as.
+            tight (bool): whether to save with tight bounding boxes.
+
+        Returns:
+            (tuple): the (filename, savefig kwargs) pair.
+
     """
     # If this is the first log being done.
-    if SERIAL == None: gen_serial()
-    
-    plot_fname = PLOT_PATH / f'{SERIAL}.pdf'
-    # Save the figure
-    plt.savefig(plot_fname, bbox_inches='tight')    
+    if SERIAL is None: gen_serial()
+
+    plot_fname = f'{_PLOT_PREFIX}{SERIAL}.{fmt}'
+    kwargs = {'format': fmt}
+    if fmt == 'png':
+        # Fixed raster resolution for the fast preview default only; other
+            # formats respect the figure's own dpi
+        kwargs['dpi'] = 100
+    if tight:
+        kwargs['bbox_inches'] = 'tight'
+
+    return plot_fname, kwargs
+
+
+def logfig(fmt='png', tight=False):
+    """ Logs the figure without showing it. The save runs on a worker
+        process, so the caller only pays to pickle the figure rather than blocking on rendering and encoding.
+
+        Kwargs:
+            fmt (str): the file format to save as. Defaults to png, which uses matplotlib's raster Agg path and is considerably faster than the vector pdf backend. Pass 'pdf' for vector output.
+            tight (bool): whether to save with tight bounding boxes. Off by default since it forces matplotlib to render the figure twice.
+
+        Returns:
+            (None): none
+
+    """
+    plt = _import_plt()
+    plot_fname, kwargs = _savefig_args(fmt, tight)
+    # Hand the pickled figure to the worker and return immediately
+    _ensure_plot_worker()
+    _PLOT_Q.put((pickle.dumps(plt.gcf()), plot_fname, kwargs))
+
 
+def logfig_sync(fmt='png', tight=False):
+    """ Same as logfig, but saves the figure on the calling process. Useful
+        for debugging or when the figure doesn't pickle.
 
-def showfig():
+        Kwargs:
+            fmt (str): the file format to save as.
+            tight (bool): whether to save with tight bounding boxes.
+
+        Returns:
+            (None): none
+
+    """
+    plt = _import_plt()
+    plot_fname, kwargs = _savefig_args(fmt, tight)
+    # Save the figure through a large explicit buffer to coalesce the
+        # backend's many small writes
+    with open(plot_fname, 'wb', buffering=1 << 20) as fp:
+        plt.savefig(fp, **kwargs)
+
+
+def showfig(fmt='png', tight=False):
     """ Wrapper to save figure to temp folder with current serial and show it.
-    
+        The save happens in-process since the figure is about to be rendered for display anyway, skipping the worker round-trip.
+
+        Kwargs:
+            fmt (str): the file format to save as.
+            tight (bool): whether to save with tight bounding boxes.
+
         Returns:
             (None): none
-    
+
     """
-    # Log the figure, then show it.
-    logfig()
+    plt = _import_plt()
+    plot_fname, kwargs = _savefig_args(fmt, tight)
+
+    # print_figure renders on the output backend's own canvas (Agg for png),
+        # so no explicit draw beforehand — plt.show draws the GUI canvas
+        # itself
+    plt.gcf().canvas.print_figure(plot_fname, **kwargs)
     plt.show()
 
 